@@ -1,5 +1,4 @@
 from __future__ import annotations
-from io import BytesIO
 
 import sys
 import time
@@ -10,16 +9,6 @@ import dolphin_memory_engine
 __all__ = ["Vec3", "RawGhostData"]
 
 
-def validate_ptr(name: str):
-    def inner(func):
-        def wrapper(*args, **kwargs):
-            if args[0] == 0:
-                raise IndexError(f"{name} is NULL!")
-            return func(*args, **kwargs)
-        return wrapper
-    return inner
-
-
 UNINITIALIZED_GAME_ID = "\0\0\0\0"
 VALID_GAME_IDS = ["RMGP", "RMGE", "RMGJ", "RMGK", "RMGW",
                   "SB4P", "SB4E", "SB4J", "SB4K", "SB4W"]
@@ -63,6 +52,14 @@ OFFSET_IS_SMG2 = 0x10
 OFFSET_GST_DATA_TYPE = 0x14
 OFFSET_GST_DATA_STRUCT = 0x18
 GST_DATA_STRUCT_SIZE = 0x2E
+GST_RECORDER_INFO_SIZE = OFFSET_GST_DATA_STRUCT + GST_DATA_STRUCT_SIZE
+
+STRUCT_GST_RECORDER_INFO_STATE = struct.Struct(">Ii")  # update frame, recorder mode
+STRUCT_GST_RECORDER_INFO_HEADER = struct.Struct(">IiIi?3xi")  # state, stage name*, scenario, is SMG2, data type
+STRUCT_GHOST_DATA = struct.Struct(">3f3h9bx2I2?h5bx")  # matches GST_DATA_STRUCT_SIZE, including padding
+
+CSTRING_CHUNK_SIZE = 64
+CSTRING_PAGE_SIZE = 0x1000  # memory regions end at page boundaries, so reads are never allowed to cross one
 
 
 def dolphin_get_game_id() -> str:
@@ -74,7 +71,6 @@ def dolphin_get_game_id() -> str:
     return dolphin_memory_engine.read_bytes(0, 4).decode("ascii")
 
 
-@validate_ptr("s32*")
 def dolphin_read_s32(ptr: int) -> int:
     """
     Reads a signed 32-bit integer at the specified address in Dolphin's emulated game memory and returns it.
@@ -82,10 +78,12 @@ def dolphin_read_s32(ptr: int) -> int:
     :param ptr: the pointer to the signed 32-bit integer.
     :return: the value read.
     """
+    if ptr == 0:
+        raise IndexError("s32* is NULL!")
+
     return dolphin_memory_engine.read_word(ptr)
 
 
-@validate_ptr("u32*")
 def dolphin_read_u32(ptr: int) -> int:
     """
     Reads an unsigned 32-bit integer at the specified address in Dolphin's emulated game memory and returns it.
@@ -93,10 +91,12 @@ def dolphin_read_u32(ptr: int) -> int:
     :param ptr: the pointer to the unsigned 32-bit integer.
     :return: the value read.
     """
+    if ptr == 0:
+        raise IndexError("u32* is NULL!")
+
     return dolphin_memory_engine.read_word(ptr) & 0xFFFFFFFF
 
 
-@validate_ptr("f32*")
 def dolphin_read_f32(ptr: int) -> int:
     """
     Reads a 32-bit floating point number at the specified address in Dolphin's emulated game memory and returns it.
@@ -104,10 +104,12 @@ def dolphin_read_f32(ptr: int) -> int:
     :param ptr: the pointer to the 32-bit float.
     :return: the value read.
     """
+    if ptr == 0:
+        raise IndexError("f32* is NULL!")
+
     return dolphin_memory_engine.read_float(ptr)
 
 
-@validate_ptr("bool*")
 def dolphin_read_bool(ptr: int) -> bool:
     """
     Reads a boolean value at the specified address in Dolphin's emulated game memory and returns it.
@@ -115,10 +117,24 @@ def dolphin_read_bool(ptr: int) -> bool:
     :param ptr: the pointer to the boolean value.
     :return: the value read.
     """
+    if ptr == 0:
+        raise IndexError("bool* is NULL!")
+
     return dolphin_memory_engine.read_byte(ptr) != 0
 
 
-@validate_ptr("char*")
+def clamp_to_page(ptr: int, size: int) -> int:
+    """
+    Clamps the size of a read starting at the specified address so that it does not cross a page boundary. Reading
+    ahead of a C-string's terminator is thus safe even if the string is located at the very end of a memory region.
+
+    :param ptr: the address to read from.
+    :param size: the desired number of bytes.
+    :return: the number of bytes that may be read.
+    """
+    return min(size, CSTRING_PAGE_SIZE - (ptr & (CSTRING_PAGE_SIZE - 1)))
+
+
 def dolphin_read_cstring(ptr: int, encoding: str = "ascii") -> str:
     """
     Reads a C-string at the specified address in Dolphin's emulated game memory and returns it.
@@ -127,18 +143,43 @@ def dolphin_read_cstring(ptr: int, encoding: str = "ascii") -> str:
     :param encoding: the string's encoding.
     :return: the value read.
     """
-    chars = bytearray()
+    if ptr == 0:
+        raise IndexError("char* is NULL!")
+
+    # Most strings end within the first chunk, so they are decoded right away without being collected
+    chunk = dolphin_memory_engine.read_bytes(ptr, clamp_to_page(ptr, CSTRING_CHUNK_SIZE))
+    end = chunk.find(b"\0")
+    if end >= 0:
+        return chunk[:end].decode(encoding)
+
+    chars = bytearray(chunk)
     while True:
-        char = dolphin_memory_engine.read_byte(ptr)
-        ptr += 1
-        if char == 0:
+        ptr += len(chunk)
+        chunk = dolphin_memory_engine.read_bytes(ptr, clamp_to_page(ptr, CSTRING_CHUNK_SIZE))
+        end = chunk.find(b"\0")
+        if end >= 0:
+            chars += chunk[:end]
             break
         else:
-            chars.append(char)
+            chars += chunk
     return chars.decode(encoding)
 
 
-@validate_ptr("GstRecorderInfo*")
+def dolphin_read_gst_recorder_info_block(gst_recorder_info_ptr: int) -> bytes:
+    """
+    Reads the entire GstRecorderInfo, including the raw ghost data, from Dolphin's emulated game memory in a single
+    access and returns its bytes. The fields can be parsed locally using ``STRUCT_GST_RECORDER_INFO_HEADER`` or
+    ``STRUCT_GST_RECORDER_INFO_STATE`` and ``unpack_ghost_data_struct``.
+
+    :param gst_recorder_info_ptr: the pointer to GstRecorderInfo.
+    :return: the bytes read.
+    """
+    if gst_recorder_info_ptr == 0:
+        raise IndexError("GstRecorderInfo* is NULL!")
+
+    return dolphin_memory_engine.read_bytes(gst_recorder_info_ptr, GST_RECORDER_INFO_SIZE)
+
+
 def dolphin_read_update_frame(gst_recorder_info_ptr: int) -> int:
     """
     Reads the update frame number associated with the GstRecorderInfo in Dolphin's emulated game memory and returns it.
@@ -146,10 +187,12 @@ def dolphin_read_update_frame(gst_recorder_info_ptr: int) -> int:
     :param gst_recorder_info_ptr: the pointer to GstRecorderInfo.
     :return: the value read.
     """
+    if gst_recorder_info_ptr == 0:
+        raise IndexError("GstRecorderInfo* is NULL!")
+
     return dolphin_read_u32(gst_recorder_info_ptr + OFFSET_UPDATE_FRAME)
 
 
-@validate_ptr("GstRecorderInfo*")
 def dolphin_read_recorder_mode(gst_recorder_info_ptr: int) -> int:
     """
     Reads the recorder mode associated with the GstRecorderInfo in Dolphin's emulated game memory and returns it.
@@ -157,10 +200,12 @@ def dolphin_read_recorder_mode(gst_recorder_info_ptr: int) -> int:
     :param gst_recorder_info_ptr: the pointer to GstRecorderInfo.
     :return: the value read.
     """
+    if gst_recorder_info_ptr == 0:
+        raise IndexError("GstRecorderInfo* is NULL!")
+
     return dolphin_read_s32(gst_recorder_info_ptr + OFFSET_RECORDER_MODE)
 
 
-@validate_ptr("GstRecorderInfo*")
 def dolphin_read_stage_name(gst_recorder_info_ptr: int) -> str | None:
     """
     Reads the stage's name associated with the GstRecorderInfo in Dolphin's emulated game memory and returns it.
@@ -168,11 +213,13 @@ def dolphin_read_stage_name(gst_recorder_info_ptr: int) -> str | None:
     :param gst_recorder_info_ptr: the pointer to GstRecorderInfo.
     :return: the value read.
     """
+    if gst_recorder_info_ptr == 0:
+        raise IndexError("GstRecorderInfo* is NULL!")
+
     stage_name_ptr = dolphin_read_u32(gst_recorder_info_ptr + OFFSET_STAGE_NAME_PTR)
     return dolphin_read_cstring(stage_name_ptr)
 
 
-@validate_ptr("GstRecorderInfo*")
 def dolphin_read_stage_scenario(gst_recorder_info_ptr: int) -> int:
     """
     Reads the currently selected scenario associated with the GstRecorderInfo in Dolphin's emulated game memory and
@@ -181,10 +228,12 @@ def dolphin_read_stage_scenario(gst_recorder_info_ptr: int) -> int:
     :param gst_recorder_info_ptr: the pointer to GstRecorderInfo.
     :return: the value read.
     """
+    if gst_recorder_info_ptr == 0:
+        raise IndexError("GstRecorderInfo* is NULL!")
+
     return dolphin_read_s32(gst_recorder_info_ptr + OFFSET_STAGE_SCENARIO)
 
 
-@validate_ptr("GstRecorderInfo*")
 def dolphin_read_is_smg2(gst_recorder_info_ptr: int) -> bool:
     """
     Returns ``True`` if the GstRecordInfo in Dolphin's emulated game memory is for SMG2, otherwise ``False``.
@@ -192,10 +241,12 @@ def dolphin_read_is_smg2(gst_recorder_info_ptr: int) -> bool:
     :param gst_recorder_info_ptr: the pointer to GstRecorderInfo.
     :return: True if the game is SMG2, otherwise False.
     """
+    if gst_recorder_info_ptr == 0:
+        raise IndexError("GstRecorderInfo* is NULL!")
+
     return dolphin_read_bool(gst_recorder_info_ptr + OFFSET_IS_SMG2)
 
 
-@validate_ptr("GstRecorderInfo*")
 def dolphin_read_ghost_data_type(gst_recorder_info_ptr: int) -> int:
     """
     Reads the ghost data type associated with the GstRecorderInfo in Dolphin's emulated game memory and returns it.
@@ -203,10 +254,12 @@ def dolphin_read_ghost_data_type(gst_recorder_info_ptr: int) -> int:
     :param gst_recorder_info_ptr: the pointer to GstRecorderInfo.
     :return: the value read.
     """
+    if gst_recorder_info_ptr == 0:
+        raise IndexError("GstRecorderInfo* is NULL!")
+
     return dolphin_read_s32(gst_recorder_info_ptr + OFFSET_GST_DATA_TYPE)
 
 
-@validate_ptr("GstRecorderInfo*")
 def dolphin_read_ghost_data_struct(gst_recorder_info_ptr: int, dest: RawGhostData):
     """
     Reads the raw ghost data associated with the GstRecorderInfo in Dolphin's emulated game memory.
@@ -214,32 +267,36 @@ def dolphin_read_ghost_data_struct(gst_recorder_info_ptr: int, dest: RawGhostDat
     :param gst_recorder_info_ptr: the pointer to GstRecorderInfo.
     :param dest: the ghost data to be overwritten.
     """
+    if gst_recorder_info_ptr == 0:
+        raise IndexError("GstRecorderInfo* is NULL!")
+
     raw = dolphin_memory_engine.read_bytes(gst_recorder_info_ptr + OFFSET_GST_DATA_STRUCT, GST_DATA_STRUCT_SIZE)
+    unpack_ghost_data_struct(raw, dest)
 
-    pos_f_x, pos_f_y, pos_f_z = struct.unpack_from(">3f", raw, 0x00)
-    pos_i_x, pos_i_y, pos_i_z = struct.unpack_from(">3h", raw, 0x0C)
-    rot_x, rot_y, rot_z = struct.unpack_from("3b", raw, 0x12)
-    scale_x, scale_y, scale_z = struct.unpack_from("3b", raw, 0x15)
-    vel_x, vel_y, vel_z = struct.unpack_from("3b", raw, 0x18)
-    bck_name_ptr, bck_hash = struct.unpack_from(">2I", raw, 0x1C)
-    use_bck_hash, use_pos_float = struct.unpack_from("2?", raw, 0x24)
-    bck_frame, weight_0, weight_1, weight_2, weight_3, bck_rate = struct.unpack_from(">h5b", raw, 0x26)
-
-    dest.position_f.x = pos_f_x
-    dest.position_f.y = pos_f_y
-    dest.position_f.z = pos_f_z
-    dest.position_i.x = pos_i_x
-    dest.position_i.y = pos_i_y
-    dest.position_i.z = pos_i_z
-    dest.rotation.x = rot_x
-    dest.rotation.y = rot_y
-    dest.rotation.z = rot_z
-    dest.scale.x = scale_x
-    dest.scale.y = scale_y
-    dest.scale.z = scale_z
-    dest.velocity.x = vel_x
-    dest.velocity.y = vel_y
-    dest.velocity.z = vel_z
+
+def unpack_ghost_data_struct(raw: bytes, dest: RawGhostData, offset: int = 0):
+    """
+    Parses raw ghost data from a buffer that was read from Dolphin's emulated game memory. Only the action's name is
+    read from Dolphin's memory, as the buffer contains just a pointer to it.
+
+    :param raw: the buffer containing the raw ghost data.
+    :param dest: the ghost data to be overwritten.
+    :param offset: the raw ghost data's offset into the buffer.
+    """
+    (pos_f_x, pos_f_y, pos_f_z, pos_i_x, pos_i_y, pos_i_z, rot_x, rot_y, rot_z, scale_x, scale_y, scale_z,
+     vel_x, vel_y, vel_z, bck_name_ptr, bck_hash, use_bck_hash, use_pos_float, bck_frame,
+     weight_0, weight_1, weight_2, weight_3, bck_rate) = STRUCT_GHOST_DATA.unpack_from(raw, offset)
+
+    vec = dest.position_f
+    vec.x, vec.y, vec.z = pos_f_x, pos_f_y, pos_f_z
+    vec = dest.position_i
+    vec.x, vec.y, vec.z = pos_i_x, pos_i_y, pos_i_z
+    vec = dest.rotation
+    vec.x, vec.y, vec.z = rot_x, rot_y, rot_z
+    vec = dest.scale
+    vec.x, vec.y, vec.z = scale_x, scale_y, scale_z
+    vec = dest.velocity
+    vec.x, vec.y, vec.z = vel_x, vel_y, vel_z
 
     dest.action_name = dolphin_read_cstring(bck_name_ptr, encoding="shift_jisx0213")
     dest.action_hash = bck_hash
@@ -248,10 +305,7 @@ def dolphin_read_ghost_data_struct(gst_recorder_info_ptr: int, dest: RawGhostDat
     dest.use_position_float = use_pos_float
 
     dest.bck_frame = bck_frame
-    dest.track_weights[0] = weight_0
-    dest.track_weights[1] = weight_1
-    dest.track_weights[2] = weight_2
-    dest.track_weights[3] = weight_3
+    dest.track_weights[:] = weight_0, weight_1, weight_2, weight_3
     dest.bck_rate = bck_rate
 
 
@@ -274,32 +328,61 @@ PACKET_FLAG_BCK_RATE = 0x1000
 PACKET_FLAG_ACTION_HASH = 0x2000
 PACKET_FLAG_POSITION_FLOAT = 0x4000
 
+STRUCT_PACKET_VEC3_F32 = struct.Struct(">3f")
+STRUCT_PACKET_VEC3_S16 = struct.Struct(">3h")
+STRUCT_PACKET_VEC3_S8 = struct.Struct(">3b")
+STRUCT_PACKET_S8 = struct.Struct(">b")
+STRUCT_PACKET_S16 = struct.Struct(">h")
+STRUCT_PACKET_U32 = struct.Struct(">I")
+STRUCT_PACKET_HEADER = struct.Struct(">2BH")  # packet index, packet size, packet flags
+PACKET_SIZE_LIMIT = 0x100  # a packet's size, including its header, is stored as a byte
+
+OUTPUT_BUFFER_SIZE = 0x10000
+
+# Encoded, NUL-terminated action names. Ghosts cycle through a small set of animations, so there are few entries.
+action_name_bytes_cache: dict[str, bytes] = {}
+
+
+def encode_action_name(action_name: str) -> bytes:
+    """
+    Returns the action's name as it is stored in GhostPackets, encoded and NUL-terminated. The result is cached.
+
+    :param action_name: the action's name.
+    :return: the encoded name.
+    """
+    action_name_bytes = action_name_bytes_cache.get(action_name)
+
+    if action_name_bytes is None:
+        action_name_bytes = (action_name + "\0").encode("ascii")
+        action_name_bytes_cache[action_name] = action_name_bytes
+
+    return action_name_bytes
+
 
 class Vec3:
     """Represents a simple 3D vector."""
+    __slots__ = ("x", "y", "z")
+
     def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
         self.x = x
         self.y = y
         self.z = z
 
     def set(self, other: Vec3):
-        self.x = other.x
-        self.y = other.y
-        self.z = other.z
+        self.x, self.y, self.z = other.x, other.y, other.z
 
     def __eq__(self, other):
-        if type(other) != Vec3:
-            return False
-        return self.x == other.x and self.y == other.y and self.z == other.z
-
-    def __ne__(self, other):
-        if type(other) != Vec3:
-            return True
-        return self.x != other.x or self.y != other.y or self.z != other.z
+        if other.__class__ is not Vec3:
+            return NotImplemented
+        return (self.x, self.y, self.z) == (other.x, other.y, other.z)
 
 
 class RawGhostData:
     """Holds raw ghost data generated by the game. The data can be packed into smaller GhostPacket chunks."""
+    __slots__ = ("ghost_data_type", "is_smg2", "position_i", "position_f", "rotation", "scale", "velocity",
+                 "action_name", "action_hash", "use_action_hash", "use_position_float", "bck_frame", "track_weights",
+                 "bck_rate", "_packet_flags_", "_action_name_bytes_")
+
     def __init__(self, ghost_data_type: int, is_smg2: bool):
         self.ghost_data_type = ghost_data_type
         self.is_smg2 = is_smg2
@@ -318,6 +401,7 @@ class RawGhostData:
         self.bck_rate = 0
 
         self._packet_flags_ = 0
+        self._action_name_bytes_ = b"\0"
 
     def compare_and_update(self, other: RawGhostData):
         """
@@ -328,133 +412,187 @@ class RawGhostData:
         """
         # No object seems to use velocity, so it won't be updated here
 
-        self._packet_flags_ = 0
+        packet_flags = 0
 
         self.use_position_float = other.use_position_float
         self.use_action_hash = other.use_action_hash
 
+        # Vectors are compared component-wise here to avoid dispatching to Vec3.__ne__ for every frame
         if self.is_smg2 and self.use_position_float:
-            if self.position_f != other.position_f:
-                self._packet_flags_ |= PACKET_FLAG_POSITION_FLOAT
-                self.position_f.set(other.position_f)
+            old, new = self.position_f, other.position_f
+            if old.x != new.x or old.y != new.y or old.z != new.z:
+                packet_flags |= PACKET_FLAG_POSITION_FLOAT
+                old.set(new)
         else:
-            if self.position_i != other.position_i:
-                self._packet_flags_ |= PACKET_FLAG_POSITION_INT
-                self.position_i.set(other.position_i)
-
-        if self.rotation.x != other.rotation.x:
-            self._packet_flags_ |= PACKET_FLAG_ROTATION_X
-            self.rotation.x = other.rotation.x
-
-        if self.rotation.y != other.rotation.y:
-            self._packet_flags_ |= PACKET_FLAG_ROTATION_Y
-            self.rotation.y = other.rotation.y
-
-        if self.rotation.z != other.rotation.z:
-            self._packet_flags_ |= PACKET_FLAG_ROTATION_Z
-            self.rotation.z = other.rotation.z
-
-        if self.scale != other.scale:
-            self._packet_flags_ |= PACKET_FLAG_SCALE
-            self.scale.set(other.scale)
+            old, new = self.position_i, other.position_i
+            if old.x != new.x or old.y != new.y or old.z != new.z:
+                packet_flags |= PACKET_FLAG_POSITION_INT
+                old.set(new)
+
+        # Rotation axes and track weights are checked as a whole first, since they rarely change all at once
+        old, new = self.rotation, other.rotation
+        if (old.x, old.y, old.z) != (new.x, new.y, new.z):
+            if old.x != new.x:
+                packet_flags |= PACKET_FLAG_ROTATION_X
+                old.x = new.x
+
+            if old.y != new.y:
+                packet_flags |= PACKET_FLAG_ROTATION_Y
+                old.y = new.y
+
+            if old.z != new.z:
+                packet_flags |= PACKET_FLAG_ROTATION_Z
+                old.z = new.z
+
+        old, new = self.scale, other.scale
+        if old.x != new.x or old.y != new.y or old.z != new.z:
+            packet_flags |= PACKET_FLAG_SCALE
+            old.set(new)
 
         if self.use_action_hash:
-            if self.action_hash != other.action_hash:
-                self._packet_flags_ |= PACKET_FLAG_ACTION_HASH
-                self.action_hash = other.action_hash
+            action_hash = other.action_hash
+            if self.action_hash != action_hash:
+                packet_flags |= PACKET_FLAG_ACTION_HASH
+                self.action_hash = action_hash
         else:
-            if self.action_name != other.action_name:
-                self._packet_flags_ |= PACKET_FLAG_ACTION_NAME
-                self.action_name = other.action_name
-
-        if self.bck_frame != other.bck_frame:
-            self._packet_flags_ |= PACKET_FLAG_BCK_FRAME
-            self.bck_frame = other.bck_frame
-
-        if self.track_weights[0] != other.track_weights[0]:
-            self._packet_flags_ |= PACKET_FLAG_TRACK_WEIGHT_0
-            self.track_weights[0] = other.track_weights[0]
-
-        if self.track_weights[1] != other.track_weights[1]:
-            self._packet_flags_ |= PACKET_FLAG_TRACK_WEIGHT_1
-            self.track_weights[1] = other.track_weights[1]
-
-        if self.track_weights[2] != other.track_weights[2]:
-            self._packet_flags_ |= PACKET_FLAG_TRACK_WEIGHT_2
-            self.track_weights[2] = other.track_weights[2]
-
-        if self.track_weights[3] != other.track_weights[3]:
-            self._packet_flags_ |= PACKET_FLAG_TRACK_WEIGHT_3
-            self.track_weights[3] = other.track_weights[3]
-
-        if self.bck_rate != other.bck_rate:
-            self._packet_flags_ |= PACKET_FLAG_BCK_RATE
-            self.bck_rate = other.bck_rate
-
-    def pack(self) -> tuple[bytes, int]:
+            action_name = other.action_name
+            if self.action_name != action_name:
+                packet_flags |= PACKET_FLAG_ACTION_NAME
+                self.action_name = action_name
+                self._action_name_bytes_ = encode_action_name(action_name)
+
+        bck_frame = other.bck_frame
+        if self.bck_frame != bck_frame:
+            packet_flags |= PACKET_FLAG_BCK_FRAME
+            self.bck_frame = bck_frame
+
+        old, new = self.track_weights, other.track_weights
+        if old != new:
+            for i in range(4):
+                if old[i] != new[i]:
+                    packet_flags |= PACKET_FLAG_TRACK_WEIGHT_0 << i
+            old[:] = new
+
+        bck_rate = other.bck_rate
+        if self.bck_rate != bck_rate:
+            packet_flags |= PACKET_FLAG_BCK_RATE
+            self.bck_rate = bck_rate
+
+        self._packet_flags_ = packet_flags
+
+    def pack_into(self, out: bytearray, offset: int) -> int:
         """
-        Packs the ghost data into a smaller GhostPacket chunk according to the packet flags. The resulting packed
-        GhostPacket bytes and flags will be returned.
+        Packs the ghost data into a smaller GhostPacket chunk according to the packet flags and writes it into the
+        given buffer at the specified offset. The buffer needs to have room for ``PACKET_SIZE_LIMIT`` bytes.
 
-        :return: a tuple consisting of the packed GhostPacket and flags.
+        :param out: the buffer to write the GhostPacket to.
+        :param offset: the offset into the buffer.
+        :return: the offset following the written GhostPacket.
         """
-        out = BytesIO()
-
         packet_flags = self._packet_flags_
 
+        # Nothing changed since the previous frame, so the packet has no body
+        if packet_flags == 0:
+            return offset
+
         if packet_flags & PACKET_FLAG_POSITION_FLOAT:
-            out.write(struct.pack(">3f", self.position_f.x, self.position_f.y, self.position_f.z))
+            vec = self.position_f
+            STRUCT_PACKET_VEC3_F32.pack_into(out, offset, vec.x, vec.y, vec.z)
+            offset += 12
         elif packet_flags & PACKET_FLAG_POSITION_INT:
-            out.write(struct.pack(">3h", self.position_i.x, self.position_i.y, self.position_i.z))
+            vec = self.position_i
+            STRUCT_PACKET_VEC3_S16.pack_into(out, offset, vec.x, vec.y, vec.z)
+            offset += 6
 
         if packet_flags & PACKET_FLAG_VELOCITY:
-            out.write(struct.pack("3b", self.velocity.x, self.velocity.y, self.velocity.z))
+            vec = self.velocity
+            STRUCT_PACKET_VEC3_S8.pack_into(out, offset, vec.x, vec.y, vec.z)
+            offset += 3
 
         if packet_flags & PACKET_FLAG_SCALE:
-            out.write(struct.pack("3b", self.scale.x, self.scale.y, self.scale.z))
+            vec = self.scale
+            STRUCT_PACKET_VEC3_S8.pack_into(out, offset, vec.x, vec.y, vec.z)
+            offset += 3
 
         if packet_flags & PACKET_FLAG_ROTATION_X:
-            out.write(struct.pack("b", self.rotation.x))
+            STRUCT_PACKET_S8.pack_into(out, offset, self.rotation.x)
+            offset += 1
 
         if packet_flags & PACKET_FLAG_ROTATION_Y:
-            out.write(struct.pack("b", self.rotation.y))
+            STRUCT_PACKET_S8.pack_into(out, offset, self.rotation.y)
+            offset += 1
 
         if packet_flags & PACKET_FLAG_ROTATION_Z:
-            out.write(struct.pack("b", self.rotation.z))
+            STRUCT_PACKET_S8.pack_into(out, offset, self.rotation.z)
+            offset += 1
 
         if packet_flags & PACKET_FLAG_ACTION_NAME:
-            out.write((self.action_name + "\0").encode("ascii"))
+            action_name = self._action_name_bytes_
+            out[offset:offset + len(action_name)] = action_name
+            offset += len(action_name)
 
         if packet_flags & PACKET_FLAG_ACTION_HASH:
-            out.write(struct.pack(">I", self.action_hash))
+            STRUCT_PACKET_U32.pack_into(out, offset, self.action_hash)
+            offset += 4
 
         if packet_flags & PACKET_FLAG_BCK_FRAME:
-            out.write(struct.pack(">h", self.bck_frame))
+            STRUCT_PACKET_S16.pack_into(out, offset, self.bck_frame)
+            offset += 2
 
         if self.is_smg2 and packet_flags & PACKET_FLAG_BCK_RATE:
-            out.write(struct.pack("b", self.bck_rate))
+            STRUCT_PACKET_S8.pack_into(out, offset, self.bck_rate)
+            offset += 1
 
         if packet_flags & PACKET_FLAG_TRACK_WEIGHT_0:
-            out.write(struct.pack("b", self.track_weights[0]))
+            STRUCT_PACKET_S8.pack_into(out, offset, self.track_weights[0])
+            offset += 1
 
         if packet_flags & PACKET_FLAG_TRACK_WEIGHT_1:
-            out.write(struct.pack("b", self.track_weights[1]))
+            STRUCT_PACKET_S8.pack_into(out, offset, self.track_weights[1])
+            offset += 1
 
         if packet_flags & PACKET_FLAG_TRACK_WEIGHT_2:
-            out.write(struct.pack("b", self.track_weights[2]))
+            STRUCT_PACKET_S8.pack_into(out, offset, self.track_weights[2])
+            offset += 1
 
         if packet_flags & PACKET_FLAG_TRACK_WEIGHT_3:
-            out.write(struct.pack("b", self.track_weights[3]))
+            STRUCT_PACKET_S8.pack_into(out, offset, self.track_weights[3])
+            offset += 1
 
         if not self.is_smg2 and packet_flags & PACKET_FLAG_BCK_RATE:
-            out.write(struct.pack("b", self.bck_rate))
+            STRUCT_PACKET_S8.pack_into(out, offset, self.bck_rate)
+            offset += 1
 
-        return out.getbuffer().tobytes(), packet_flags
+        return offset
+
+    def pack(self) -> tuple[bytes, int]:
+        """
+        Packs the ghost data into a smaller GhostPacket chunk according to the packet flags. The resulting packed
+        GhostPacket bytes and flags will be returned.
+
+        :return: a tuple consisting of the packed GhostPacket and flags.
+        """
+        out = bytearray(PACKET_SIZE_LIMIT)
+        packet_size = self.pack_into(out, 0)
+        return bytes(out[:packet_size]), self._packet_flags_
 
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Main functionality
 
+# Polling periods while waiting for Dolphin and the game
+POLL_HOOK_MILLIS = 500
+POLL_GAME_ID_MILLIS = 500
+POLL_RECORDER_INFO_MILLIS = 250
+POLL_RECORDER_MODE_MILLIS = 50
+
+# After recording a frame, the recorder sleeps for half the time that passed since the previous frame before polling for
+# the next one. Emulation may run faster than realtime, so the idle time has to follow the measured frame interval. This
+# still leaves some slack if the game suddenly runs twice as fast. The idle time is capped so that the recorder does not
+# oversleep after a single stalled frame, e.g. when the emulator was paused.
+RECORDING_IDLE_MAX_MILLIS = 10
+
+
 def record_gst_from_dolphin(output_folder_path: str, addr_gst_recorder_info_ptr: int = ADDR_GST_RECORDER_INFO_PTR):
     gst_recorder_info_ptr = 0
     recorder_state = RECORDER_MODE_WAITING
@@ -466,12 +604,14 @@ def record_gst_from_dolphin(output_folder_path: str, addr_gst_recorder_info_ptr:
     # 2 - Hook to Dolphin and check if game ID is supported
     print("Waiting for Dolphin...")
 
+    clock = FrameClock(POLL_HOOK_MILLIS)
     while not dolphin_memory_engine.is_hooked():
-        sleep_millis(500)
+        clock.wait()
         dolphin_memory_engine.hook()
 
+    clock = FrameClock(POLL_GAME_ID_MILLIS)
     while game_id == UNINITIALIZED_GAME_ID:
-        sleep_millis(500)
+        clock.wait()
         game_id = dolphin_get_game_id()
 
     print(f"Hooked to Dolphin, game ID is {game_id}!")
@@ -482,14 +622,16 @@ def record_gst_from_dolphin(output_folder_path: str, addr_gst_recorder_info_ptr:
     # 3 - Find GstRecorderInfo and wait for recording
     print(f"Searching for GstRecorderInfo* at 0x{addr_gst_recorder_info_ptr:08X}...")
 
+    clock = FrameClock(POLL_RECORDER_INFO_MILLIS)
     while gst_recorder_info_ptr == 0:
-        sleep_millis(250)
+        clock.wait()
         gst_recorder_info_ptr = dolphin_read_u32(addr_gst_recorder_info_ptr)
 
     print("Waiting for GstRecordHelper...")
 
+    clock = FrameClock(POLL_RECORDER_MODE_MILLIS)
     while recorder_state == RECORDER_MODE_WAITING:
-        sleep_millis(50)
+        clock.wait()
         recorder_state = dolphin_read_recorder_mode(gst_recorder_info_ptr)
 
     if recorder_state == RECORDER_MODE_STOPPED:
@@ -497,14 +639,18 @@ def record_gst_from_dolphin(output_folder_path: str, addr_gst_recorder_info_ptr:
         dolphin_memory_engine.un_hook()
         return
 
+    # This loop is a spin: time.sleep(0) only lets other ready threads run and otherwise returns right away, so it keeps
+    # a core busy. That is acceptable since preparation lasts only a few frames. The recording starts right after it,
+    # and a timed sleep could overshoot into the first recorded frame where the timer resolution is coarse.
     while recorder_state == RECORDER_MODE_PREPARING:
+        time.sleep(0)
         recorder_state = dolphin_read_recorder_mode(gst_recorder_info_ptr)
 
     # 5 - Get general information and prepare output
-    stage_name = dolphin_read_stage_name(gst_recorder_info_ptr)
-    stage_scenario = dolphin_read_stage_scenario(gst_recorder_info_ptr)
-    is_smg2 = dolphin_read_is_smg2(gst_recorder_info_ptr)
-    data_type = dolphin_read_ghost_data_type(gst_recorder_info_ptr)
+    gst_recorder_info = dolphin_read_gst_recorder_info_block(gst_recorder_info_ptr)
+    _, _, stage_name_ptr, stage_scenario, is_smg2, data_type = STRUCT_GST_RECORDER_INFO_HEADER.unpack_from(
+        gst_recorder_info)
+    stage_name = dolphin_read_cstring(stage_name_ptr)
     total_frames = 0
 
     if data_type == GHOST_TYPE_INVALID:
@@ -520,50 +666,115 @@ def record_gst_from_dolphin(output_folder_path: str, addr_gst_recorder_info_ptr:
     os.makedirs(gst_folder_path, exist_ok=True)
 
     with open(gst_file_path, "wb") as f:
+        # Both instances live for the entire recording. The game's data is parsed into reading_packet in place and
+        # copied into writing_packet field by field, so no ghost data objects are allocated per frame.
         writing_packet = RawGhostData(data_type, is_smg2)
         reading_packet = RawGhostData(data_type, is_smg2)
 
-        current_frame = dolphin_read_update_frame(gst_recorder_info_ptr)
-        next_frame = (current_frame + 1) & 0xFFFFFFFF
-
-        while recorder_state == RECORDER_MODE_RECORDING:
-            # Get current update frame
-            current_frame = dolphin_read_update_frame(gst_recorder_info_ptr)
-
-            if current_frame == ((next_frame - 1) & 0xFFFFFFFF):
-                continue
-            elif current_frame != next_frame:
-                print("Aborted recording due to a synchronization error!")
-                dolphin_memory_engine.un_hook()
-                return
-
-            next_frame = (current_frame + 1) & 0xFFFFFFFF
-
-            # Still recording?
-            recorder_state = dolphin_read_recorder_mode(gst_recorder_info_ptr)
-
-            if recorder_state != RECORDER_MODE_RECORDING:
-                break
-
-            # Read packet info from memory
-            dolphin_read_ghost_data_struct(gst_recorder_info_ptr, reading_packet)
-            writing_packet.compare_and_update(reading_packet)
-
-            packet_bytes, packet_flags = writing_packet.pack()
-            packet_index = total_frames & 0xFF
-            packet_size = len(packet_bytes) + 4
-
-            f.write(struct.pack(">2BH", packet_index, packet_size, packet_flags))
-            f.write(packet_bytes)
-
-            total_frames += 1
-
-        print("Stopped recording!")
+        # Packets are packed into this buffer directly, which is written to the file whenever it is almost full
+        out = bytearray(OUTPUT_BUFFER_SIZE)
+        out_view = memoryview(out)
+        out_offset = 0
+
+        last_frame = dolphin_read_update_frame(gst_recorder_info_ptr)
+
+        # Bind everything the loop calls per frame to locals to skip the global and attribute lookups
+        read_bytes = dolphin_memory_engine.read_bytes
+        unpack_recorder_state = STRUCT_GST_RECORDER_INFO_STATE.unpack_from
+        unpack_ghost_data = unpack_ghost_data_struct
+        compare_and_update = writing_packet.compare_and_update
+        pack_packet = writing_packet.pack_into
+        pack_header = STRUCT_PACKET_HEADER.pack_into
+        header_size = STRUCT_PACKET_HEADER.size
+        write = f.write
+        sleep = time.sleep
+        perf_counter = time.perf_counter
+        max_idle_time = RECORDING_IDLE_MAX_MILLIS / 1000
+        frame_time = perf_counter()
+        wake_time = frame_time
+        last_frame_interval = 0.0
+
+        try:
+            while recorder_state == RECORDER_MODE_RECORDING:
+                # Get current update frame and recorder mode along with the ghost data in a single read. The pointer
+                # was found to be non-NULL before, so the memory is read directly instead of checking it every frame.
+                gst_recorder_info = read_bytes(gst_recorder_info_ptr, GST_RECORDER_INFO_SIZE)
+                current_frame, recorder_state = unpack_recorder_state(gst_recorder_info)
+
+                # The update frame wraps around as a u32, so the difference to the last frame is masked accordingly
+                frame_delta = (current_frame - last_frame) & 0xFFFFFFFF
+
+                # While the game has not advanced yet, sleep until shortly before the next frame is due. Afterwards, the
+                # loop only yields the CPU between polls so that the frame is picked up right away.
+                if frame_delta == 0:
+                    delay = wake_time - perf_counter()
+                    sleep(delay if delay > 0 else 0)
+                    continue
+                elif frame_delta != 1:
+                    print("Aborted recording due to a synchronization error!")
+                    dolphin_memory_engine.un_hook()
+                    return
+
+                last_frame = current_frame
+
+                # A frame that was picked up late makes the measured interval too long, so the shorter one of the
+                # last two intervals is used
+                now = perf_counter()
+                frame_interval = now - frame_time
+                idle_time = (frame_interval if frame_interval < last_frame_interval else last_frame_interval) * 0.5
+                wake_time = now + (idle_time if idle_time < max_idle_time else max_idle_time)
+                frame_time = now
+                last_frame_interval = frame_interval
+
+                # Still recording?
+                if recorder_state != RECORDER_MODE_RECORDING:
+                    break
+
+                # Parse packet info that was read from memory
+                unpack_ghost_data(gst_recorder_info, reading_packet, OFFSET_GST_DATA_STRUCT)
+                compare_and_update(reading_packet)
+
+                packet_flags = writing_packet._packet_flags_
+                packet_index = total_frames & 0xFF
+
+                # A packet's size is stored as a byte, so it is guaranteed to fit into the remaining space
+                if out_offset > OUTPUT_BUFFER_SIZE - PACKET_SIZE_LIMIT:
+                    write(out_view[:out_offset])
+                    out_offset = 0
+
+                # The body is packed first since the header needs to know its size
+                packet_end = pack_packet(out, out_offset + header_size)
+                packet_size = packet_end - out_offset
+                pack_header(out, out_offset, packet_index, packet_size, packet_flags)
+                out_offset = packet_end
+
+                total_frames += 1
+
+            print("Stopped recording!")
+        finally:
+            write(out_view[:out_offset])
 
     dolphin_memory_engine.un_hook()
 
     print(f"Dumped {total_frames} ghost frames (approx. {total_frames // 60} seconds) to '{gst_file_path}'.")
 
 
-def sleep_millis(millis: int):
-    time.sleep(millis / 1000)
+class FrameClock:
+    """Paces a polling loop at a fixed period. Unlike plain sleeps, the time spent between waits does not add up."""
+    def __init__(self, period_millis: int):
+        self.period = period_millis / 1000
+        self.deadline = time.perf_counter() + self.period
+
+    def wait(self):
+        """
+        Sleeps until the next deadline is reached. If the deadline has already passed, the clock resynchronizes
+        without sleeping, so a late caller is not followed by a burst of immediate wake-ups.
+        """
+        now = time.perf_counter()
+        delay = self.deadline - now
+
+        if delay > 0:
+            self.deadline += self.period
+            time.sleep(delay)
+        else:
+            self.deadline = now + self.period